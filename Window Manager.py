@@ -7,6 +7,8 @@ import psutil
 import subprocess
 import time
 import os
+import ctypes
+from ctypes import wintypes
 
 # --- 1. AUTOSTART CONFIGURATION ---
 # Define applications to start if they are not already running.
@@ -31,43 +33,216 @@ DESIRED_LAYOUT = [
 
 # --- 3. WINDOW MANIPULATION LOGIC ---
 
+# Win32 declarations for the calls pywin32 doesn't wrap
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+GA_ROOT = 2
+QS_ALLINPUT = 0x04FF
+PM_REMOVE = 0x0001
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+user32 = ctypes.windll.user32
+WinEventProcType = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                      wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+user32.SetWinEventHook.restype = wintypes.HANDLE
+user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProcType,
+                                   wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+user32.GetAncestor.restype = wintypes.HWND
+user32.GetAncestor.argtypes = [wintypes.HWND, wintypes.UINT]
+user32.FindWindowW.restype = wintypes.HWND
+user32.FindWindowW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR]
+user32.BeginDeferWindowPos.restype = wintypes.HANDLE
+user32.BeginDeferWindowPos.argtypes = [ctypes.c_int]
+user32.DeferWindowPos.restype = wintypes.HANDLE
+user32.DeferWindowPos.argtypes = [wintypes.HANDLE, wintypes.HWND, wintypes.HWND,
+                                  ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.UINT]
+user32.EndDeferWindowPos.argtypes = [wintypes.HANDLE]
+
+kernel32 = ctypes.windll.kernel32
+kernel32.OpenProcess.restype = wintypes.HANDLE
+kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+kernel32.QueryFullProcessImageNameW.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+psapi = ctypes.windll.psapi
+psapi.EnumProcesses.argtypes = [ctypes.POINTER(wintypes.DWORD), wintypes.DWORD, ctypes.POINTER(wintypes.DWORD)]
+
+# Shared process table snapshot, so lookups made within one tick reuse a single scan
+_PROC_CACHE = {'t': 0.0, 'map': {}}
+
+def pid_name_map(ttl=0.5):
+    """Returns a {pid: process name} map, rescanning the process table at most once per `ttl` seconds."""
+    now = time.monotonic()
+    if now - _PROC_CACHE['t'] >= ttl:
+        _PROC_CACHE['map'] = {p.info['pid']: p.info['name'] or '' for p in psutil.process_iter(['pid', 'name'])}
+        _PROC_CACHE['t'] = now
+    return _PROC_CACHE['map']
+
+def exe_from_pid(pid):
+    """Returns the executable name of a process via QueryFullProcessImageNameW, or '?' if it can't be opened."""
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return '?'
+    try:
+        buf = ctypes.create_unicode_buffer(260)
+        size = wintypes.DWORD(len(buf))
+        if not kernel32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+            return '?'
+        return os.path.basename(buf.value)
+    finally:
+        kernel32.CloseHandle(handle)
+
+def running_exe_names():
+    """Returns the lowercase exe names of running processes via EnumProcesses + QueryFullProcessImageNameW."""
+    size = 1024
+    while True:
+        pids = (wintypes.DWORD * size)()
+        needed = wintypes.DWORD()
+        if not psapi.EnumProcesses(pids, ctypes.sizeof(pids), ctypes.byref(needed)):
+            return {name.lower() for name in pid_name_map().values()}
+        count = needed.value // ctypes.sizeof(wintypes.DWORD)
+        if count < size: # Otherwise the list may have been truncated; retry with a bigger buffer
+            break
+        size *= 2
+    return {exe_from_pid(pid).lower() for pid in pids[:count]} - {'?'}
+
+def iter_top_windows():
+    """Yields top-level window handles in Z-order by walking desktop siblings (no EnumWindows callback)."""
+    hwnd = win32gui.GetWindow(win32gui.GetDesktopWindow(), win32con.GW_CHILD)
+    while hwnd:
+        yield hwnd
+        hwnd = win32gui.GetWindow(hwnd, win32con.GW_HWNDNEXT)
+
 def find_window_by_exe(exe_name):
     """Finds a window handle (HWND) by its process's executable name."""
     # This helper function is used by both autostart and arrange logic
-    target_hwnd = None
-    def callback(hwnd, extra):
-        nonlocal target_hwnd
+    exe_name = exe_name.lower()
+    pid_names = pid_name_map()
+    for hwnd in iter_top_windows():
         if not win32gui.IsWindowVisible(hwnd) or not win32gui.GetWindowText(hwnd):
-            return True
+            continue
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        try:
-            if psutil.Process(pid).name().lower() == exe_name.lower():
-                target_hwnd = hwnd
-                return False # Stop searching
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-        return True
-    win32gui.EnumWindows(callback, None)
-    return target_hwnd
+        if pid_names.get(pid, '').lower() == exe_name:
+            return hwnd
+    return None
 
 def find_window_by_title_substring(title_substring):
     """Finds a window handle (HWND) by a partial match of its title."""
-    target_hwnd = None
-    def callback(hwnd, extra):
-        nonlocal target_hwnd
-        if title_substring.lower() in win32gui.GetWindowText(hwnd).lower():
-            target_hwnd = hwnd
-            return False # Stop searching
-        return True
-    win32gui.EnumWindows(callback, None)
-    return target_hwnd
+    title_substring = title_substring.lower()
+    for hwnd in iter_top_windows():
+        if title_substring in win32gui.GetWindowText(hwnd).lower():
+            return hwnd
+    return None
+
+def find_window_by_exact_title(title):
+    """Finds a visible top-level window whose title is exactly `title` with a single FindWindow call."""
+    hwnd = user32.FindWindowW(None, title)
+    if hwnd and win32gui.IsWindowVisible(hwnd):
+        return hwnd
+    return None
+
+def find_window_by_title(identifier):
+    """Finds a window by title, trying an exact match first and falling back to a substring scan."""
+    return find_window_by_exact_title(identifier) or find_window_by_title_substring(identifier)
+
+def snapshot_windows():
+    """Enumerates visible top-level windows once and returns lookup tables for them.
+
+    Returns (by_exe, titles): a dict of lowercase exe name -> HWND and a list of
+    (lowercase title, HWND) pairs. Process names are resolved in a single batch.
+    """
+    pid_names = pid_name_map()
+    by_exe, titles = {}, []
+    for hwnd in iter_top_windows():
+        title = win32gui.GetWindowText(hwnd)
+        if not title or not win32gui.IsWindowVisible(hwnd):
+            continue
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        exe_name = pid_names.get(pid)
+        if exe_name:
+            by_exe.setdefault(exe_name.lower(), hwnd)
+        titles.append((title.lower(), hwnd))
+    return by_exe, titles
+
+def lookup_window(identifier, by_exe, titles):
+    """Resolves an identifier (exe name or title substring) against a snapshot_windows() result."""
+    if '.' in identifier: # It's an exe name
+        return by_exe.get(identifier.lower())
+    hwnd = find_window_by_exact_title(identifier) # It's a title; exact matches skip the scan
+    if hwnd:
+        return hwnd
+    title_substring = identifier.lower()
+    return next((hwnd for title, hwnd in titles if title_substring in title), None)
+
+def match_windows(identifiers, by_exe, titles, found):
+    """Records in `found` ({identifier: hwnd}) every not-yet-found identifier that resolves against the snapshot."""
+    for identifier in identifiers:
+        if identifier not in found:
+            hwnd = lookup_window(identifier, by_exe, titles)
+            if hwnd:
+                found[identifier] = hwnd
+
+def wait_for_windows_event_driven(identifiers, timeout):
+    """Waits for windows matching `identifiers`, woken by the OS whenever a top-level window is shown or renamed.
+
+    Returns {identifier: hwnd} for the windows that appeared, or None if the hook could not be installed.
+    """
+    targets = set(identifiers)
+    found = {}
+
+    def on_window_event(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+        if id_object != OBJID_WINDOW or not hwnd or user32.GetAncestor(hwnd, GA_ROOT) != hwnd:
+            return
+        title = win32gui.GetWindowText(hwnd)
+        if not title or not win32gui.IsWindowVisible(hwnd):
+            return
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        pid_names = pid_name_map()
+        if pid not in pid_names: # Window from a process started after the last scan
+            pid_names = pid_name_map(ttl=0)
+        by_exe, titles = {pid_names.get(pid, '').lower(): hwnd}, [(title.lower(), hwnd)]
+        match_windows(targets, by_exe, titles, found)
+
+    callback = WinEventProcType(on_window_event) # Must stay referenced while the hooks are installed
+    hooks = [user32.SetWinEventHook(event, event, None, callback, 0, 0, WINEVENT_OUTOFCONTEXT)
+             for event in (EVENT_OBJECT_SHOW, EVENT_OBJECT_NAMECHANGE)]
+    try:
+        if not all(hooks):
+            return None
+
+        # Windows that were already open before the hooks went in
+        by_exe, titles = snapshot_windows()
+        match_windows(targets, by_exe, titles, found)
+
+        # Sleep until the hook callbacks have input to deliver, or the timeout expires
+        deadline = time.monotonic() + timeout
+        msg = wintypes.MSG()
+        while len(found) < len(targets):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            user32.MsgWaitForMultipleObjects(0, None, False, int(remaining * 1000), QS_ALLINPUT)
+            while user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE):
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        return found
+    finally:
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
 
 def autostart_and_wait_for_windows():
-    """Starts configured apps if not running, then waits for target windows to appear."""
+    """Starts configured apps if not running, then waits for target windows to appear.
+
+    Returns {identifier: hwnd} for every DESIRED_LAYOUT window that was found.
+    """
     print("--- Starting Application Check ---")
-    running_procs = {p.info['name'].lower() for p in psutil.process_iter(['name'])}
+    running_procs = running_exe_names()
     
-    apps_to_wait_for = [item[0] for item in DESIRED_LAYOUT]
+    apps_to_wait_for = {item[0] for item in DESIRED_LAYOUT}
     
     # 1. Start processes
     for app in AUTOSTART_APPS:
@@ -82,49 +257,76 @@ def autostart_and_wait_for_windows():
             print(f"{app['name']} is already running.")
 
     # 2. Wait for windows to appear
+    if not apps_to_wait_for:
+        # Nothing to arrange, so skip the event hooks and the window scan
+        print("\nNo windows configured in DESIRED_LAYOUT. Nothing to wait for.")
+        return {}
     print(f"\n--- Waiting for windows to open (timeout: {WAIT_TIMEOUT}s) ---")
+    found = wait_for_windows_event_driven(apps_to_wait_for, WAIT_TIMEOUT)
+    if found is not None:
+        if len(found) == len(apps_to_wait_for):
+            print("All target windows are open. Proceeding with arrangement.")
+        else:
+            print(f"Timeout reached. Proceeding with any windows that were found.")
+        return found
+
+    # Fall back to polling if the event hook could not be installed
+    found = {}
     start_time = time.time()
     while time.time() - start_time < WAIT_TIMEOUT:
-        found_all = True
-        for identifier in apps_to_wait_for:
-            hwnd = None
-            if '.' in identifier: # It's an exe name
-                hwnd = find_window_by_exe(identifier)
-            else: # It's a title substring
-                hwnd = find_window_by_title_substring(identifier)
-            
-            if not hwnd:
-                found_all = False
-                break # No need to check others, we are not ready yet
-        
-        if found_all:
+        # One window sweep per tick, shared by every identifier
+        by_exe, titles = snapshot_windows()
+        match_windows(apps_to_wait_for, by_exe, titles, found)
+
+        if len(found) == len(apps_to_wait_for):
             print("All target windows are open. Proceeding with arrangement.")
-            return
+            return found
 
         print("Waiting...", end='\r')
         time.sleep(0.5)
 
     print(f"\nTimeout reached. Proceeding with any windows that were found.")
+    return found
+
 
+def arrange_windows_on_startup(found=None):
+    """Arranges windows based on the DESIRED_LAYOUT configuration.
 
-def arrange_windows_on_startup():
-    """Arranges windows based on the DESIRED_LAYOUT configuration."""
+    `found` is the {identifier: hwnd} map from autostart_and_wait_for_windows; only identifiers
+    missing from it (or whose window has since closed) are looked up again.
+    """
     print("\n--- Arranging Windows ---")
+    found = found or {}
+    placements = []
     for identifier, (x, y, width, height) in DESIRED_LAYOUT:
-        hwnd = None
-        if '.' in identifier:
-            hwnd = find_window_by_exe(identifier)
-        else:
-            hwnd = find_window_by_title_substring(identifier)
+        hwnd = found.get(identifier)
+        if not hwnd or not win32gui.IsWindow(hwnd):
+            if '.' in identifier:
+                hwnd = find_window_by_exe(identifier)
+            else:
+                hwnd = find_window_by_title(identifier)
 
         if hwnd:
             print(f"  > Arranging window for '{identifier}' (HWND: {hwnd})")
+            # DeferWindowPos doesn't restore minimized windows, so do that first
             if win32gui.IsIconic(hwnd):
                 win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            
-            win32gui.MoveWindow(hwnd, x, y, width, height, True)
+            placements.append((hwnd, x, y, width, height))
         else:
             print(f"  > Window for '{identifier}' not found, skipping arrangement.")
+
+    # Reposition every window in one batch so the desktop reflows once
+    if placements:
+        hdwp = user32.BeginDeferWindowPos(len(placements))
+        for hwnd, x, y, width, height in placements:
+            if hdwp:
+                hdwp = user32.DeferWindowPos(hdwp, hwnd, None, x, y, width, height,
+                                             win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE)
+        if hdwp:
+            user32.EndDeferWindowPos(hdwp)
+        else: # The batch failed and was discarded; move the windows one by one instead
+            for hwnd, x, y, width, height in placements:
+                win32gui.MoveWindow(hwnd, x, y, width, height, True)
     print("--- Arrangement Complete ---\n")
 
 
@@ -140,39 +342,57 @@ class WindowManagerApp(tk.Tk):
         top_frame.pack(fill=tk.X)
         template_btn = ttk.Button(top_frame, text="Template Button", command=self.do_nothing)
         template_btn.pack(side=tk.LEFT, padx=(0, 10))
-        refresh_btn = ttk.Button(top_frame, text="Refresh List", command=self.populate_window_list)
+        refresh_btn = ttk.Button(top_frame, text="Refresh List", command=self.request_refresh)
         refresh_btn.pack(side=tk.LEFT)
-        self.canvas = tk.Canvas(self, borderwidth=0)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        # A Listbox draws only the rows in view, so a busy desktop doesn't mean one widget per window
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical")
+        self.listbox = tk.Listbox(self, borderwidth=0, activestyle="none", yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.listbox.yview)
         self.scrollbar.pack(side="right", fill="y")
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.canvas_frame = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
-        self.canvas.bind("<Configure>", self.on_canvas_configure)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.listbox.bind("<<ListboxSelect>>", self.on_window_selected)
+        self._hwnds = [] # hwnd for each listbox row
+        self._titles = [] # title shown in each listbox row
+        self._pending_refresh = False
         self.populate_window_list()
 
-    def on_frame_configure(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    def on_window_selected(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.show_window_info(self._hwnds[selection[0]])
 
-    def on_canvas_configure(self, event):
-        self.canvas.itemconfig(self.canvas_frame, width=event.width)
-        
     def do_nothing(self):
         print("Template button clicked. It does nothing for now!")
 
+    def request_refresh(self):
+        """Schedules a list refresh for the next idle point; repeated requests before then collapse into one."""
+        if self._pending_refresh:
+            return
+        self._pending_refresh = True
+        self.after_idle(self._do_refresh)
+
+    def _do_refresh(self):
+        self._pending_refresh = False
+        self.populate_window_list()
+
     def populate_window_list(self):
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        """Refills the list with the open windows in one bulk insert, skipping it when nothing changed."""
         windows = []
-        def callback(hwnd, extra):
-            if win32gui.IsWindowVisible(hwnd) and win32gui.GetWindowText(hwnd):
-                windows.append((hwnd, win32gui.GetWindowText(hwnd)))
-        win32gui.EnumWindows(callback, None)
-        for hwnd, title in sorted(windows, key=lambda item: item[1].lower()):
-            btn = ttk.Button(self.scrollable_frame, text=title, command=lambda h=hwnd: self.show_window_info(h))
-            btn.pack(fill=tk.X, padx=5, pady=2, expand=True)
+        for hwnd in iter_top_windows():
+            title = win32gui.GetWindowText(hwnd)
+            if title and win32gui.IsWindowVisible(hwnd):
+                windows.append((title.lower(), hwnd, title))
+        windows.sort() # Titles are lowercased once each rather than on every comparison
+        hwnds = [hwnd for _, hwnd, _ in windows]
+        titles = [title for _, _, title in windows]
+        if hwnds == self._hwnds and titles == self._titles:
+            return
+
+        first_visible = self.listbox.yview()[0]
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *titles)
+        self.listbox.yview_moveto(first_visible)
+        self._hwnds, self._titles = hwnds, titles
 
     def show_window_info(self, hwnd):
         try:
@@ -180,7 +400,7 @@ class WindowManagerApp(tk.Tk):
             x, y, right, bottom = rect
             width, height = right - x, bottom - y
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            exe_name = psutil.Process(pid).name()
+            exe_name = exe_from_pid(pid)
             title = win32gui.GetWindowText(hwnd)
             print(f"---\n  Title: {title}\n  Executable: {exe_name}\n  Position: ({x}, {y})\n  Size: ({width}, {height})\n---")
         except Exception as e:
@@ -189,10 +409,10 @@ class WindowManagerApp(tk.Tk):
 # --- 5. SCRIPT EXECUTION ---
 if __name__ == "__main__":
     # 1. Start required applications and wait for them to open
-    autostart_and_wait_for_windows()
+    found = autostart_and_wait_for_windows()
 
-    # 2. Arrange the windows based on the layout config
-    arrange_windows_on_startup()
+    # 2. Arrange the windows based on the layout config, reusing the handles found while waiting
+    arrange_windows_on_startup(found)
 
     # 3. Launch the GUI manager
     app = WindowManagerApp()
@@ -2,13 +2,15 @@ import tkinter as tk
 from tkinter import messagebox
 import ntcore
 import os
-import time
+import functools
 
 # Attempt to import Pillow for image manipulation.
 try:
     from PIL import Image, ImageTk, ImageDraw, ImageFont, ImageOps
+    # Pillow-SIMD releases predate Image.Resampling, so fall back to the old module-level constant
+    RESAMPLE_NEAREST = getattr(Image, "Resampling", Image).NEAREST
 except ImportError:
-    print("Pillow library not found. Please install it: pip install Pillow")
+    print("Pillow library not found. Please install it: pip install Pillow (or pillow-simd for SIMD-accelerated filters)")
     print("The color filter feature will be disabled.")
     Image = None
     ImageTk = None
@@ -16,7 +18,14 @@ except ImportError:
 # --- Configuration ---
 NT_SERVER_IP = "10.66.47.2" #127.0.0.1
 NT_TABLE_NAME = "SmartDashboard/QuestNavManager"
-UPDATE_PERIOD_MS = 500
+
+@functools.lru_cache(maxsize=8)
+def _get_font(size):
+    """Loads the tag ID font once per size instead of re-parsing the TrueType file on every draw."""
+    try:
+        return ImageFont.truetype("arialbd.ttf", size)
+    except IOError:
+        return ImageFont.load_default()
 
 # --- AprilTag Data ---
 APRILTAG_COORDS = {
@@ -27,14 +36,19 @@ APRILTAG_COORDS = {
     17: (260, 260), 18: (240, 220), 19: (260, 165), 20: (320, 165),
     21: (340, 218), 22: (320, 260)
 }
+# Parallel (struct-of-arrays) views of APRILTAG_COORDS, for transforming all tags at once
+TAG_IDS = tuple(APRILTAG_COORDS)
+TAG_XY = tuple(APRILTAG_COORDS.values())
 
 class QuestNavManagerDashboard:
     # --- Appearance Configuration ---
+    CANVAS_SIZE = (800, 450)
     TAG_DISPLAY_SIZE = (50, 50)
     DESATURATION_FACTOR = 0.4
     TAG_ID_FONT_COLOR = "yellow"
     TAG_ID_OUTLINE_COLOR = "black"
     TAG_ID_FONT_SIZE_RATIO = 0.5
+    FILTER_NAMES = ('red', 'blue', 'magenta')
 
     def __init__(self, master):
         self.master = master
@@ -44,7 +58,8 @@ class QuestNavManagerDashboard:
 
         self.field_bg_photo = None
         self.tag_data = {}
-        self.initial_sync_done = False
+        self._over_tag = False
+        self._active_tag_id = -1 # Last ActiveTag value applied to the tag colours
 
         # BooleanVar to hold the state of the enabled checkbox
         self.enabled_var = tk.BooleanVar(value=True)
@@ -57,8 +72,41 @@ class QuestNavManagerDashboard:
         self.inst.startClient4("dashboard")
         self.inst.setServer(NT_SERVER_IP)
 
+        # Publishers are created once and reused by the button callbacks
+        self._pub_field = self.table.getDoubleTopic("SelectedFieldIndex").publish()
+        self._pub_layout = self.table.getDoubleTopic("SelectedLayoutIndex").publish()
+        self._pub_changed = self.table.getBooleanTopic("Changed").publish()
+        self._pub_active_tag = self.table.getDoubleTopic("SetActiveTag").publish()
+        self._pub_calibration = self.table.getBooleanTopic("SetCalibration").publish()
+        self._pub_enabled = self.table.getBooleanTopic("enabled").publish()
+        self._pub_delete = self.table.getBooleanTopic("SetDelete").publish()
+
+        # Subscribers for the tag status values, so each read skips the topic/entry lookup
+        self._tag_subs = {tag_id: self.tags_subtable.getDoubleTopic(str(tag_id)).subscribe(-1) for tag_id in TAG_IDS}
+        self._active_sub = self.table.getDoubleTopic("ActiveTag").subscribe(-1)
+        master.protocol("WM_DELETE_WINDOW", self.destroy)
+
+        self._ensure_all_placeholder_tags(TAG_IDS)
         self._draw_field_and_tags()
-        self.periodic_update()
+
+        # Connection status is pushed by ntcore on connect/disconnect instead of being polled
+        self._apply_conn_state(self.inst.isConnected())
+        # Every listener handle is kept so destroy() can remove it; ntcore aborts at exit if a Python listener is still registered
+        self._listeners = [self.inst.addConnectionListener(True, self._on_conn_event)]
+
+        # The inputs follow their NT values as soon as they are published or change
+        value_flags = ntcore.EventFlags.kImmediate | ntcore.EventFlags.kValueAll
+        for key, var, convert in (("SelectedFieldIndex", self.field_var, lambda v: str(int(v))),
+                                  ("SelectedLayoutIndex", self.layout_var, lambda v: str(int(v))),
+                                  ("Enabled", self.enabled_var, bool)):
+            self._listeners.append(self.inst.addListener(
+                self.table.getTopic(key), value_flags,
+                lambda event, var=var, convert=convert: self._on_input_value(var, convert, event)))
+
+        # Tag colours are re-evaluated when a status or the active tag changes, rather than on a polling timer
+        for tag_id, sub in self._tag_subs.items():
+            self._listeners.append(self.inst.addListener(sub, value_flags, lambda event, tag_ids=(tag_id,): self._on_tag_value(tag_ids)))
+        self._listeners.append(self.inst.addListener(self._active_sub, value_flags, lambda event: self.master.after(0, self._on_active_tag_changed)))
 
     def _setup_ui(self):
         control_frame = tk.Frame(self.master, bg="#2a2a3e", padx=10, pady=10)
@@ -96,42 +144,90 @@ class QuestNavManagerDashboard:
         )
         self.enabled_check.pack(side=tk.RIGHT, padx=5)
 
-        self.canvas = tk.Canvas(self.master, width=800, height=450, bg="black", highlightthickness=0)
+        self.canvas = tk.Canvas(self.master, width=self.CANVAS_SIZE[0], height=self.CANVAS_SIZE[1], bg="black", highlightthickness=0)
         self.canvas.pack(side=tk.TOP, pady=5)
         self.status_label = tk.Label(self.master, text="Connecting...", bd=1, relief=tk.SUNKEN, anchor=tk.W, fg="white", bg="#333")
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
 
     def _draw_field_and_tags(self):
+        """Composites every tag into the field image, which is shown as a single canvas item.
+
+        Tags only get a canvas item of their own once a filter is applied (see update_tag_visual).
+        """
+        # The field is composited in RGB at exactly the canvas size, so Tk gets an image it can show as-is.
+        # It is cropped rather than resized because the tag coordinates are in field.png's own pixels.
+        if not Image:
+            # Without Pillow there is nothing to composite or click, so just say why the field is blank
+            self.canvas.create_text(400, 225, text="Error loading field.png:\nPillow is not installed", fill="red", font=("Arial", 14))
+            return
+
+        field_error = None
+        field_img = Image.new("RGB", self.CANVAS_SIZE, "black")
         try:
-            self.field_bg_photo = ImageTk.PhotoImage(file="field.png")
-            self.canvas.create_image(0, 0, image=self.field_bg_photo, anchor=tk.NW)
+            with Image.open("field.png") as img:
+                field_img.paste(img.convert("RGB").crop((0, 0) + self.CANVAS_SIZE))
         except Exception as e:
-            self.canvas.create_text(400, 225, text=f"Error loading field.png:\n{e}", fill="red", font=("Arial", 14))
+            field_error = e
 
-        for tag_id, coords in APRILTAG_COORDS.items():
+        tag_width, tag_height = self.TAG_DISPLAY_SIZE
+        for tag_id, (x, y) in zip(TAG_IDS, TAG_XY):
             try:
                 img_path = f"apriltags/{tag_id}.png"
-                if not os.path.exists(img_path): self._generate_placeholder_tag_image(tag_id)
-
+                # Decode once; the filtered variants are derived from this image, not from disk
                 with Image.open(img_path) as img:
-                    resized_img = img.resize(self.TAG_DISPLAY_SIZE, Image.Resampling.NEAREST)
-                    self._draw_id_on_image(resized_img, tag_id)
-                    original_photo = ImageTk.PhotoImage(resized_img)
-
-                canvas_tag = f"clickable_tag_{tag_id}"
-                canvas_id = self.canvas.create_image(coords[0], coords[1], image=original_photo, tags=canvas_tag)
-
-                self.canvas.tag_bind(canvas_tag, "<Button-1>", lambda event, id=tag_id: self.handle_tag_click(event, id))
-                self.canvas.tag_bind(canvas_tag, "<Enter>", self.on_tag_enter)
-                self.canvas.tag_bind(canvas_tag, "<Leave>", self.on_tag_leave)
+                    tag_img = img.convert("RGBA")
+                # Generated placeholders are already saved at display size
+                if tag_img.size != self.TAG_DISPLAY_SIZE:
+                    tag_img = tag_img.resize(self.TAG_DISPLAY_SIZE, RESAMPLE_NEAREST)
+                display_img = tag_img.copy()
+                self._draw_id_on_image(display_img, tag_id)
+                field_img.paste(display_img, (x - tag_width // 2, y - tag_height // 2), display_img)
 
                 self.tag_data[tag_id] = {
-                    'canvas_id': canvas_id, 'original_photo': original_photo,
-                    'filtered_photos': {}, 'current_filter': None
+                    'xy': (x, y), 'pil': tag_img, 'overlay_id': None, 'photo': None,
+                    'filtered_imgs': {}, 'current_filter': None
                 }
             except Exception as e:
                 print(f"Error loading or placing tag {tag_id}: {e}")
 
+        self.field_bg_photo = ImageTk.PhotoImage(field_img)
+        self.canvas.create_image(0, 0, image=self.field_bg_photo, anchor=tk.NW)
+        if field_error:
+            self.canvas.create_text(400, 225, text=f"Error loading field.png:\n{field_error}", fill="red", font=("Arial", 14))
+
+        # Tags are part of the background image, so clicks and hover are hit-tested against their boxes
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<Motion>", self.on_canvas_motion)
+        self.canvas.bind("<Leave>", self.on_tag_leave)
+
+        self._precompute_filters()
+
+    def _precompute_filters(self):
+        """Builds every filtered variant of every tag up front, so a filter change is just a lookup."""
+        for tag_id, tag_info in self.tag_data.items():
+            tag_info['filtered_imgs'] = self._build_all_filters(tag_info['pil'], tag_id)
+
+    def _tag_at(self, x, y):
+        """Returns the ID of the topmost tag covering canvas point (x, y), or None."""
+        half_width, half_height = self.TAG_DISPLAY_SIZE[0] / 2, self.TAG_DISPLAY_SIZE[1] / 2
+        for tag_id in reversed(self.tag_data): # Later tags are drawn on top
+            tag_x, tag_y = self.tag_data[tag_id]['xy']
+            if abs(x - tag_x) <= half_width and abs(y - tag_y) <= half_height:
+                return tag_id
+        return None
+
+    def on_canvas_click(self, event):
+        tag_id = self._tag_at(event.x, event.y)
+        if tag_id is not None:
+            self.handle_tag_click(event, tag_id)
+
+    def on_canvas_motion(self, event):
+        """Switches the cursor only when the pointer moves onto or off a tag."""
+        over_tag = self._tag_at(event.x, event.y) is not None
+        if over_tag != self._over_tag:
+            if over_tag: self.on_tag_enter(event)
+            else: self.on_tag_leave(event)
+
     def handle_tag_click(self, event, tag_id):
         """Called when a tag is clicked. Publishes the ID to NetworkTables."""
         if not self.inst.isConnected():
@@ -140,25 +236,23 @@ class QuestNavManagerDashboard:
             return
 
         print(f"Clicked Tag {tag_id}. Setting 'SetActiveTag' on NetworkTables.")
-        self.table.getDoubleTopic("SetActiveTag").publish().set(float(tag_id))
+        self._pub_active_tag.set(float(tag_id))
 
     def on_tag_enter(self, event):
         """Changes the cursor to a hand to show the tag is clickable."""
+        self._over_tag = True
         self.canvas.config(cursor="hand2")
 
     def on_tag_leave(self, event):
         """Changes the cursor back to the default."""
+        self._over_tag = False
         self.canvas.config(cursor="")
 
     def _draw_id_on_image(self, image, tag_id):
         if not Image: return
         d = ImageDraw.Draw(image)
         text_to_draw = str(tag_id)
-        try:
-            font_size = int(self.TAG_DISPLAY_SIZE[1] * self.TAG_ID_FONT_SIZE_RATIO)
-            font = ImageFont.truetype("arialbd.ttf", font_size)
-        except IOError:
-            font = ImageFont.load_default()
+        font = _get_font(int(self.TAG_DISPLAY_SIZE[1] * self.TAG_ID_FONT_SIZE_RATIO))
 
         text_bbox = d.textbbox((0,0), text_to_draw, font=font)
         text_width = text_bbox[2] - text_bbox[0]
@@ -167,11 +261,9 @@ class QuestNavManagerDashboard:
         y = (self.TAG_DISPLAY_SIZE[1] - text_height) / 2 - (text_bbox[1] * 0.5)
 
         outline_thickness = 2
-        for i in range(-outline_thickness, outline_thickness + 1):
-            for j in range(-outline_thickness, outline_thickness + 1):
-                 if i != 0 or j != 0:
-                    d.text((x + i, y + j), text_to_draw, font=font, fill=self.TAG_ID_OUTLINE_COLOR)
-        d.text((x, y), text_to_draw, font=font, fill=self.TAG_ID_FONT_COLOR)
+        # The stroke is rendered together with the glyphs in a single pass
+        d.text((x, y), text_to_draw, font=font, fill=self.TAG_ID_FONT_COLOR,
+               stroke_width=outline_thickness, stroke_fill=self.TAG_ID_OUTLINE_COLOR)
 
     def on_calibrate_clicked(self):
         """Called when the Calibrate button is clicked. Sets 'SetCalibration' to true on NetworkTables."""
@@ -180,7 +272,7 @@ class QuestNavManagerDashboard:
             return
 
         print("Calibrate button clicked. Setting 'SetCalibration' to True.")
-        self.table.getBooleanTopic("SetCalibration").publish().set(True)
+        self._pub_calibration.set(True)
 
     # Method to handle the enabled/disabled toggle
     def on_enabled_toggle(self):
@@ -194,7 +286,7 @@ class QuestNavManagerDashboard:
 
         is_enabled = self.enabled_var.get()
         print(f"Setting 'Enabled' to {is_enabled} on NetworkTables.")
-        self.table.getBooleanTopic("enabled").publish().set(is_enabled)
+        self._pub_enabled.set(is_enabled)
 
     def on_apply_clicked(self):
         if not self.inst.isConnected():
@@ -207,9 +299,9 @@ class QuestNavManagerDashboard:
             messagebox.showerror("Invalid Input", "Field and Layout must be integer numbers.")
             return
 
-        self.table.getDoubleTopic("SelectedFieldIndex").publish().set(field_index)
-        self.table.getDoubleTopic("SelectedLayoutIndex").publish().set(layout_index)
-        self.table.getBooleanTopic("Changed").publish().set(True)
+        self._pub_field.set(field_index)
+        self._pub_layout.set(layout_index)
+        self._pub_changed.set(True)
 
     # --- ADDED --- Method for the delete button
     def on_delete_clicked(self):
@@ -223,45 +315,53 @@ class QuestNavManagerDashboard:
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the currently selected layout? This cannot be undone."):
             # 3. If user confirms, publish to NetworkTables
             print("Delete confirmed. Setting 'SetDelete' to 1.")
-            self.table.getBooleanTopic("SetDelete").publish().set(True)
+            self._pub_delete.set(True)
         else:
             # 4. If user cancels, do nothing (optional: print a message)
             print("Delete action cancelled by user.")
     # --- END ADDED SECTION ---
 
-    def periodic_update(self):
-        if self.inst.isConnected():
+    def destroy(self):
+        """Removes the NT listeners and closes the cached publishers and subscribers before tearing down the window."""
+        # Removed first, so no late NT event calls master.after on a destroyed root
+        for listener in self._listeners:
+            self.inst.removeListener(listener)
+        publishers = (self._pub_field, self._pub_layout, self._pub_changed, self._pub_active_tag,
+                      self._pub_calibration, self._pub_enabled, self._pub_delete)
+        for handle in (*publishers, self._active_sub, *self._tag_subs.values()):
+            handle.close()
+        self.master.destroy()
+
+    def _on_conn_event(self, event):
+        """Called on the NT listener thread; hands the connection change over to the Tk thread."""
+        is_connected = event.is_(ntcore.EventFlags.kConnected)
+        self.master.after(0, self._apply_conn_state, is_connected)
+
+    def _apply_conn_state(self, is_connected):
+        if is_connected:
             self.status_label.config(text=f"Connected to {NT_SERVER_IP}", fg="#39FF14")
-            if not self.initial_sync_done:
-                self.sync_inputs_from_nt()
-                self.initial_sync_done = True
-            self.update_tag_colors_from_nt()
         else:
             self.status_label.config(text=f"Disconnected - trying to connect to {NT_SERVER_IP}", fg="#FF4136")
-            self.initial_sync_done = False
-        self.master.after(UPDATE_PERIOD_MS, self.periodic_update)
-
-    def sync_inputs_from_nt(self):
-        print("Syncing UI with NetworkTables values...")
-        while self.table.getNumber("SelectedFieldIndex", None) is None or self.table.getNumber("SelectedLayoutIndex", None) is None:
-            print("Waiting for Field/Layout keys to be published on NT server...")
-            time.sleep(0.1)
-
-        field_index = int(self.table.getNumber("SelectedFieldIndex", -1))
-        layout_index = int(self.table.getNumber("SelectedLayoutIndex", -1))
-        # Sync the enabled state from NT, defaulting to True if not present
-        enabled_state = self.table.getBoolean("Enabled", True)
-
-        self.field_var.set(str(field_index))
-        self.layout_var.set(str(layout_index))
-        self.enabled_var.set(enabled_state)
 
-        print(f"Synced. Field: {field_index}, Layout: {layout_index}, Enabled: {enabled_state}")
-
-    def update_tag_colors_from_nt(self):
-        active_tag_id = self.table.getNumber("ActiveTag", -1)
-        for tag_id, tag_info in self.tag_data.items():
-            tag_status = self.tags_subtable.getNumber(str(tag_id), -1)
+    def _on_input_value(self, var, convert, event):
+        """Called on the NT listener thread when a synced input's topic gets a value; sets it on the Tk thread."""
+        self.master.after(0, var.set, convert(event.data.value.value()))
+
+    def _on_tag_value(self, tag_ids):
+        """Called on the NT listener thread when a tag status or the active tag changes; recolours on the Tk thread."""
+        self.master.after(0, self.update_tag_colors_from_nt, tag_ids)
+
+    def _on_active_tag_changed(self):
+        # Only the previously active tag and the newly active one can change colour
+        previous_tag_id, self._active_tag_id = self._active_tag_id, self._active_sub.get()
+        self.update_tag_colors_from_nt((previous_tag_id, self._active_tag_id))
+
+    def update_tag_colors_from_nt(self, tag_ids):
+        active_tag_id = self._active_tag_id
+        for tag_id in tag_ids:
+            tag_info = self.tag_data.get(tag_id)
+            if tag_info is None: continue
+            tag_status = self._tag_subs[tag_id].get()
             is_red_status = (tag_status == 0)
             is_blue_status = (active_tag_id == tag_id)
 
@@ -275,55 +375,63 @@ class QuestNavManagerDashboard:
                 else: self.update_tag_visual(tag_id, required_filter)
                 tag_info['current_filter'] = required_filter
 
-    def _apply_filter_to_image(self, img_path, filter_color):
-        if not Image: return None
-        try:
-            with Image.open(img_path).convert("RGBA") as img:
-                resized_img = img.resize(self.TAG_DISPLAY_SIZE, Image.Resampling.NEAREST)
-
-                r, g, b, a = resized_img.split()
-                l = resized_img.convert('L')
-                grey_bleed = l.point(lambda i: int(i * self.DESATURATION_FACTOR))
-
-                if filter_color == 'red':
-                    filtered_img = Image.merge('RGBA', (r, grey_bleed, grey_bleed, a))
-                elif filter_color == 'blue':
-                    filtered_img = Image.merge('RGBA', (grey_bleed, grey_bleed, b, a))
-                elif filter_color == 'magenta':
-                    filtered_img = Image.merge('RGBA', (r, grey_bleed, b, a))
-                else:
-                    return None
-
-                self._draw_id_on_image(filtered_img, int(os.path.basename(img_path).split('.')[0]))
-                return ImageTk.PhotoImage(filtered_img)
-        except (FileNotFoundError, ValueError) as e:
-            print(f"Warning: Could not process/filter image {img_path}: {e}")
-            return None
+    def _build_all_filters(self, img, tag_id):
+        """Returns {filter name: PIL image} for the (already resized, RGBA) tag image."""
+        if not Image: return {}
+        # The dimmed grey band (ITU-R 601-2 luma, as convert('L')) is the same for every filter, so build it once
+        rgb = img.convert('RGB')
+        red, _, blue = rgb.split()
+        grey = rgb.convert('L', tuple(c * self.DESATURATION_FACTOR for c in (0.299, 0.587, 0.114)) + (0,))
+        alpha = img.getchannel('A')
+        bands_by_filter = {
+            'red': (red, grey, grey),
+            'blue': (grey, grey, blue),
+            'magenta': (red, grey, blue),
+        }
+
+        filtered_imgs = {}
+        for filter_name in self.FILTER_NAMES:
+            filtered_img = Image.merge('RGBA', bands_by_filter[filter_name] + (alpha,))
+            self._draw_id_on_image(filtered_img, tag_id)
+            filtered_imgs[filter_name] = filtered_img
+        return filtered_imgs
 
     def update_tag_visual(self, tag_id, filter_name):
         if tag_id not in self.tag_data: return
         tag_info = self.tag_data[tag_id]
-        if filter_name in tag_info['filtered_photos']:
-            photo_to_show = tag_info['filtered_photos'][filter_name]
+        # Every variant was built at load by _precompute_filters, so this is only a lookup
+        img_to_show = tag_info['filtered_imgs'].get(filter_name)
+        if img_to_show is None: return
+        # Filtered tags are drawn as an overlay on top of the composited field.
+        # Each tag keeps one PhotoImage and overlay item; a filter change pastes new pixels into it.
+        if tag_info['photo'] is None:
+            x, y = tag_info['xy']
+            tag_info['photo'] = ImageTk.PhotoImage(img_to_show)
+            tag_info['overlay_id'] = self.canvas.create_image(x, y, image=tag_info['photo'])
         else:
-            img_path = f"apriltags/{tag_id}.png"
-            new_photo = self._apply_filter_to_image(img_path, filter_name)
-            if new_photo:
-                tag_info['filtered_photos'][filter_name] = new_photo
-                photo_to_show = new_photo
-            else: return
-        self.canvas.itemconfig(tag_info['canvas_id'], image=photo_to_show)
+            tag_info['photo'].paste(img_to_show)
+            self.canvas.itemconfig(tag_info['overlay_id'], state=tk.NORMAL)
 
     def reset_tag_visual(self, tag_id):
         if tag_id in self.tag_data:
             tag_info = self.tag_data[tag_id]
-            self.canvas.itemconfig(tag_info['canvas_id'], image=tag_info['original_photo'])
+            if tag_info['overlay_id'] is not None:
+                self.canvas.itemconfig(tag_info['overlay_id'], state=tk.HIDDEN)
+
+    def _ensure_all_placeholder_tags(self, tag_ids):
+        """Generates placeholders for any missing tag PNGs, using one mkdir and one directory scan."""
+        if not Image: return
+        os.makedirs("apriltags", exist_ok=True)
+        with os.scandir("apriltags") as entries:
+            existing_tag_files = {entry.name for entry in entries}
+        for tag_id in tag_ids:
+            if f"{tag_id}.png" not in existing_tag_files:
+                self._generate_placeholder_tag_image(tag_id)
 
     def _generate_placeholder_tag_image(self, tag_id):
         if not Image: return
-        if not os.path.exists("apriltags"): os.makedirs("apriltags")
         img_path = f"apriltags/{tag_id}.png"
-        img = Image.new('RGB', self.TAG_DISPLAY_SIZE, color = 'darkgrey')
+        img = Image.new('RGBA', self.TAG_DISPLAY_SIZE, color = 'darkgrey')
         self._draw_id_on_image(img, tag_id)
         img.save(img_path)
 
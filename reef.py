@@ -1,8 +1,12 @@
-import time
 import tkinter as tk
 import math
+import functools
+import logging
+import threading
 import ntcore
 
+log = logging.getLogger(__name__)
+
 # --- Configuration ---
 # For local testing with OutlineViewer, use "127.0.0.1"
 # For connecting to a RoboRIO, use its IP, e.g., "10.66.47.2" or "roborio-6647-frc.local"
@@ -11,18 +15,53 @@ nt_robot_ip = "10.66.47.2"
 nt_server_ip = nt_sim_ip
 # MODIFIED: Changed table name to match SmartDashboard's structure
 NT_TABLE_NAME = "SmartDashboard/ReefState"
-UPDATE_PERIOD_MS = 100 # How often to check for updates from NetworkTables
+SERVER_RETRY_MS = 3000 # How long to wait for a connection before switching between the sim and robot servers
+
+# Mappings from NT string values to internal states
+STICK_STATE_MAP = {"EMPTY": (False, False, False), "GAMEPIECE": (True, False, False), "RESTRICTED": (False, True, False), "GOAL": (False, False, True)}
+SIDE_STATE_MAP = {"ALLOWED": False, "RESTRICTED": True}
+
+# Canvas tags shared by the drawing code and the event bindings
+DOT_TAG = "toggle_dot"
+HEX_SIDE_TAG = "hexagon_side"
+
+@functools.lru_cache(maxsize=None)
+def unit_vector(angle_degrees):
+    """(cos, sin) for a dashboard angle, where 0 degrees points straight up.
+
+    The layout only uses a couple dozen distinct angles across every radius, so each is computed once.
+    """
+    angle_radians = math.radians(angle_degrees - 90)
+    return math.cos(angle_radians), math.sin(angle_radians)
 
 # --- Data object for each dot ---
 class DotNode:
     """A data object representing a single interactive dot on the dashboard."""
-    def __init__(self, canvas_id, dot_type, side_id, sub_reef_id=None, radius_name=None, level_name=None):
+    __slots__ = ('canvas_id', 'type', 'side_id', 'sub_reef_id', 'radius_name', 'level_name', 'topic_path',
+                 'default_color', 'hover_color', 'active_color', 'flagged_color', 'goal_color', 'current_fill',
+                 'publisher', 'subscriber', 'has_algae', 'is_active', 'is_flagged', 'is_goal')
+
+    def __init__(self, canvas_id, dot_type, side_id, colors, sub_reef_id=None, radius_name=None, level_name=None):
         self.canvas_id = canvas_id
         self.type = dot_type
+        # Colors only depend on the dot type, so they are resolved once here instead of on every repaint
+        self.default_color = colors[dot_type]
+        self.hover_color = colors[f"{dot_type}_hover"]
+        self.active_color = colors['white_toggled'] if dot_type == 'purple' else colors['green_toggled']
+        self.flagged_color = colors['red_flagged']
+        self.goal_color = colors['goal']
+        self.current_fill = self.default_color # Last fill sent to the canvas
+        self.publisher = None # NT string publisher, created on first publish
+        self.subscriber = None # NT string subscriber, set up by subscribe_to_nt
         self.side_id = side_id
         self.sub_reef_id = sub_reef_id # 0 or 1 for purple, None for green
         self.radius_name = radius_name # e.g., 'level_1'
         self.level_name = level_name   # e.g., 'L2' (from Java code)
+        # NT topic (relative to NT_TABLE_NAME) holding this dot's state
+        if dot_type == 'green':
+            self.topic_path = f"Side{side_id}/Algae"
+        else:
+            self.topic_path = f"Side{side_id}/{sub_reef_id}/{level_name}"
         self.has_algae = False
         self.is_active = False
         self.is_flagged = False
@@ -38,9 +77,17 @@ class DotNode:
 # --- Data object for each hexagon side (now a trapezoid) ---
 class HexSideNode:
     """A data object representing one side of the central hexagon."""
-    def __init__(self, canvas_id, side_id):
+    __slots__ = ('canvas_id', 'side_id', 'topic_path', 'default_color', 'flagged_color', 'current_fill', 'publisher', 'subscriber', 'is_flagged')
+
+    def __init__(self, canvas_id, side_id, colors):
         self.canvas_id = canvas_id
         self.side_id = side_id
+        self.topic_path = f"Side{side_id}/State" # NT topic (relative to NT_TABLE_NAME) holding this side's state
+        self.default_color = colors['purple']
+        self.flagged_color = colors['red_flagged']
+        self.current_fill = self.default_color # Last fill sent to the canvas
+        self.publisher = None # NT string publisher, created on first publish
+        self.subscriber = None # NT string subscriber, set up by subscribe_to_nt
         self.is_flagged = False
 
     def __repr__(self):
@@ -76,16 +123,21 @@ class HexDataDashboard:
 
         # Map Python radius names to Java Level names
         self.level_map = {"level_1": "L2", "level_2": "L3", "level_3": "L4"}
-        self.inverse_level_map = {v: k for k, v in self.level_map.items()}
-
-        # Lookups for mapping NT data to GUI elements
-        self.dot_nodes = {} # canvas_id -> Node
-        self.purple_dots_lookup = {} # (side_id, sub_reef_id, radius_name) -> Node
-        self.green_dots_lookup = {}  # side_id -> Node
-        self.hexagon_sides = {} # canvas_id -> Node
-        self.hex_sides_lookup = {} # side_id -> Node
+
+        # Every canvas item's node, dots and hexagon sides alike (NT updates reach nodes through their own listeners)
+        self.items = {} # canvas_id -> DotNode | HexSideNode
         
+        # NT values waiting to be applied on the Tk thread; filled by the listener thread
+        self._pending_states = {} # Node -> latest NT state string
+        self._pending_lock = threading.Lock()
+        self._states_flush_scheduled = False
+        self._deferred_fills = None # Node -> fill, collected instead of painted while a batch is applied
+        # Canvas tags shared by whole groups of items (all purple dots, all green dots, all sides) -> their nodes
+        self._fill_groups = {}
+
         self.currently_hovered_id = None
+        self._painted_hover_id = None # Dot currently showing the hover colour
+        self._hover_flush_pending = False
 
         self.canvas = tk.Canvas(master, width=550, height=550, bg=self.COLORS["bg"], highlightthickness=0)
         self.canvas.pack()
@@ -96,6 +148,11 @@ class HexDataDashboard:
         self.inst.startClient4("dashboard")
         global nt_server_ip
         self.inst.setServer(nt_server_ip)
+        # Kept for the app's lifetime so NT doesn't unpublish the topic between clicks
+        self._changed_publisher = self.table.getBooleanTopic("Changed").publish()
+        # Every listener handle is kept so destroy() can remove it; ntcore aborts at exit if a Python listener is still registered
+        self._listeners = []
+        master.protocol("WM_DELETE_WINDOW", self.destroy)
         
         self.status_label = tk.Label(master, text="Connecting...", bd=1, relief=tk.SUNKEN, anchor=tk.W, fg="white", bg="#333")
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
@@ -103,8 +160,12 @@ class HexDataDashboard:
 
         self.draw_dashboard()
         self.bind_events()
+        self.subscribe_to_nt()
         
-        self.periodic_update() # Start the sync loop
+        # Connection status is pushed by ntcore; node state arrives through the NT listeners
+        self._apply_conn_state(self.inst.isConnected())
+        self._listeners.append(self.inst.addConnectionListener(True, self._on_conn_event))
+        self.master.after(SERVER_RETRY_MS, self.periodic_update) # Start the server fallback loop
 
     # --- Drawing and Initialization ---
     def draw_dashboard(self):
@@ -112,11 +173,17 @@ class HexDataDashboard:
         self.draw_hexagon()
 
     def bind_events(self):
-        self.canvas.tag_bind("toggle_dot", "<Button-1>", self.handle_left_click)
-        self.canvas.tag_bind("toggle_dot", "<Button-3>", self.handle_right_click)
-        self.canvas.tag_bind("toggle_dot", "<Enter>", self.on_dot_enter)
-        self.canvas.tag_bind("toggle_dot", "<Leave>", self.on_dot_leave)
-        self.canvas.tag_bind("hexagon_side", "<Button-3>", self.handle_hex_side_toggle)
+        # Each button is bound once on the canvas and dispatched on the clicked item's node type
+        self.canvas.bind("<Button-1>", self.on_left_click)
+        self.canvas.bind("<Button-3>", self.on_right_click)
+        # Item Enter/Leave only exist as tag bindings
+        self.canvas.tag_bind(DOT_TAG, "<Enter>", self.on_dot_enter)
+        self.canvas.tag_bind(DOT_TAG, "<Leave>", self.on_dot_leave)
+
+    def _current_node(self):
+        """Returns the node of the canvas item under the pointer, or None over empty canvas."""
+        current = self.canvas.find_withtag('current')
+        return self.items.get(current[0]) if current else None
 
     def draw_hexagon(self):
         outer_points, inner_points = [], []
@@ -125,83 +192,96 @@ class HexDataDashboard:
             outer_points.append(self.get_circle_position(self.RADII["hex_outer"], angle))
             inner_points.append(self.get_circle_position(self.RADII["hex_inner"], angle))
 
-        for i in range(6):
-            trapezoid_points = [outer_points[i], outer_points[(i + 1) % 6], inner_points[(i + 1) % 6], inner_points[i]]
-            poly_id = self.canvas.create_polygon(trapezoid_points, fill=self.COLORS["purple"], outline="", tags="hexagon_side")
-            node = HexSideNode(poly_id, i)
-            self.hexagon_sides[poly_id] = node
-            self.hex_sides_lookup[i] = node
+        # Geometry first, then one tight creation loop, then the node bookkeeping
+        trapezoids = [(*outer_points[i], *outer_points[(i + 1) % 6], *inner_points[(i + 1) % 6], *inner_points[i]) for i in range(6)]
+        fill = self.COLORS["purple"]
+        poly_ids = [self.canvas.create_polygon(*coords, fill=fill, outline="", tags=HEX_SIDE_TAG) for coords in trapezoids]
+        side_group = self._fill_groups.setdefault(HEX_SIDE_TAG, [])
+
+        for i, poly_id in enumerate(poly_ids):
+            node = HexSideNode(poly_id, i, self.COLORS)
+            self.items[poly_id] = node
+            side_group.append(node)
 
     def draw_orbital_dots(self):
         purple_radii_names = ['level_1', 'level_2', 'level_3']
         r = self.DOT_SIZE
         side_center_angles = [0, 60, 120, 180, 240, 300]
 
+        # Phase 1: work out every dot's bounding box and identity
+        dot_specs = [] # (bbox, dot_type, side_id, sub_reef_id, radius_name)
         for side_id, center_angle in enumerate(side_center_angles):
             # Purple Dots (Sub-Reefs)
             for radius_name in purple_radii_names:
                 radius = self.RADII[radius_name]
-                level_name = self.level_map[radius_name]
                 angles = [center_angle + self.DOT_OFFSET_ANGLE, center_angle - self.DOT_OFFSET_ANGLE]
                 for sub_reef_id, angle in enumerate(angles):
                     # --- MODIFICATION: Invert the sub_reef_id ---
                     # This swaps which dot is 0 and which is 1.
                     inverted_sub_reef_id = 1 - sub_reef_id
-                    
                     x, y = self.get_circle_position(radius, angle)
-                    dot_id = self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=self.COLORS["purple"], outline="", tags="toggle_dot")
-                    
-                    # Use the new inverted ID for the node and the lookup key
-                    node = DotNode(dot_id, 'purple', side_id, inverted_sub_reef_id, radius_name=radius_name, level_name=level_name)
-                    self.dot_nodes[dot_id] = node
-                    self.purple_dots_lookup[(side_id, inverted_sub_reef_id, radius_name)] = node
-            
+                    dot_specs.append(((x-r, y-r, x+r, y+r), 'purple', side_id, inverted_sub_reef_id, radius_name))
+
             # Green Dot (Algae)
             x, y = self.get_circle_position(self.RADII['green_level'], center_angle)
-            dot_id = self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=self.COLORS["green"], outline="", tags="toggle_dot")
-            node = DotNode(dot_id, 'green', side_id)
-            self.dot_nodes[dot_id] = node
-            self.green_dots_lookup[side_id] = node
+            dot_specs.append(((x-r, y-r, x+r, y+r), 'green', side_id, None, None))
 
-    # --- Event Handlers (User Interaction) ---
-    def handle_hex_side_toggle(self, event):
-        clicked_id = self.canvas.find_closest(event.x, event.y)[0]
-        if clicked_id in self.hexagon_sides:
-            node = self.hexagon_sides[clicked_id]
-            node.is_flagged = not node.is_flagged
-            self._update_hex_side_visuals(node)
-            self.publish_hex_side_state(node)
-            self._signal_state_change() # MODIFIED: Signal change to NT
-            print(f"Toggled and Published: {node}")
-
-    def handle_right_click(self, event):
-        clicked_id = self.canvas.find_closest(event.x, event.y)[0]
-        if clicked_id in self.dot_nodes:
-            node = self.dot_nodes[clicked_id]
-            node.is_flagged = not node.is_flagged
-            if node.is_flagged:
-                node.is_active = False # Flagging overrides active state
-            self._update_dot_visuals(node)
-            self.publish_dot_state(node)
-            self._signal_state_change() # MODIFIED: Signal change to NT
-            print(f"Right-clicked and Published: {node}")
-
-    def handle_left_click(self, event):
-        clicked_id = self.canvas.find_closest(event.x, event.y)[0]
-        if clicked_id in self.dot_nodes:
-            node = self.dot_nodes[clicked_id]
-            if node.is_goal:
-                node.is_goal = False
-            if node.is_flagged:
-                node.is_flagged = False # Unflag on left-click
+        # Phase 2: create the canvas items back to back
+        create_oval, colors = self.canvas.create_oval, self.COLORS
+        dot_ids = [create_oval(*bbox, fill=colors[dot_type], outline="", tags=(DOT_TAG, f"{dot_type}_dot")) for bbox, dot_type, *_ in dot_specs]
+
+        # Phase 3: build the nodes and lookup tables
+        for dot_id, (_, dot_type, side_id, sub_reef_id, radius_name) in zip(dot_ids, dot_specs):
+            if dot_type == 'purple':
+                # Use the inverted ID for the node (and so for its NT topic)
+                node = DotNode(dot_id, 'purple', side_id, colors, sub_reef_id, radius_name=radius_name, level_name=self.level_map[radius_name])
             else:
-                node.is_active = not node.is_active
-            if node.type == 'green':
-                node.has_algae = node.is_active
-            self._update_dot_visuals(node)
-            self.publish_dot_state(node)
-            self._signal_state_change() # MODIFIED: Signal change to NT
-            print(f"Left-clicked and Published: {node}")
+                node = DotNode(dot_id, 'green', side_id, colors)
+            self.items[dot_id] = node
+            self._fill_groups.setdefault(f"{dot_type}_dot", []).append(node)
+
+    # --- Event Handlers (User Interaction) ---
+    def on_left_click(self, event):
+        node = self._current_node()
+        if isinstance(node, DotNode):
+            self.handle_left_click(node)
+
+    def on_right_click(self, event):
+        node = self._current_node()
+        if isinstance(node, DotNode):
+            self.handle_right_click(node)
+        elif isinstance(node, HexSideNode):
+            self.handle_hex_side_toggle(node)
+
+    def handle_hex_side_toggle(self, node):
+        node.is_flagged = not node.is_flagged
+        self._update_hex_side_visuals(node)
+        self.publish_hex_side_state(node)
+        self._signal_state_change() # MODIFIED: Signal change to NT
+        log.debug("Toggled and Published: %s", node)
+
+    def handle_right_click(self, node):
+        node.is_flagged = not node.is_flagged
+        if node.is_flagged:
+            node.is_active = False # Flagging overrides active state
+        self._update_dot_visuals(node)
+        self.publish_dot_state(node)
+        self._signal_state_change() # MODIFIED: Signal change to NT
+        log.debug("Right-clicked and Published: %s", node)
+
+    def handle_left_click(self, node):
+        if node.is_goal:
+            node.is_goal = False
+        if node.is_flagged:
+            node.is_flagged = False # Unflag on left-click
+        else:
+            node.is_active = not node.is_active
+        if node.type == 'green':
+            node.has_algae = node.is_active
+        self._update_dot_visuals(node)
+        self.publish_dot_state(node)
+        self._signal_state_change() # MODIFIED: Signal change to NT
+        log.debug("Left-clicked and Published: %s", node)
 
     # --- NetworkTables Publish Methods (Python -> Java) ---
     def _signal_state_change(self):
@@ -210,7 +290,7 @@ class HexDataDashboard:
             return
         # This signals to the robot that the dashboard has updated a value.
         # The robot is expected to read the new state and set this back to False.
-        self.table.getBooleanTopic("Changed").publish().set(True)
+        self._changed_publisher.set(True)
 
     def publish_dot_state(self, node):
         if not self.inst.isConnected(): return
@@ -222,138 +302,194 @@ class HexDataDashboard:
         else:
             state_str = "EMPTY"
 
-        if node.type == 'green':
-            entry = self.table.getStringTopic(f"Side{node.side_id}/Algae").publish()
-            entry.set(state_str)
-        elif node.type == 'purple':
-            path = f"Side{node.side_id}/{node.sub_reef_id}/{node.level_name}"
-            entry = self.table.getStringTopic(path).publish()
-            entry.set(state_str)
+        # Each node publishes through one publisher that lives as long as the app
+        if node.publisher is None:
+            node.publisher = self.table.getStringTopic(node.topic_path).publish()
+        node.publisher.set(state_str)
     
     def publish_hex_side_state(self, node):
         if not self.inst.isConnected(): return
         
         state_str = "RESTRICTED" if node.is_flagged else "ALLOWED"
-        entry = self.table.getStringTopic(f"Side{node.side_id}/State").publish()
-        entry.set(state_str)
+        if node.publisher is None:
+            node.publisher = self.table.getStringTopic(node.topic_path).publish()
+        node.publisher.set(state_str)
+
+    def destroy(self):
+        """Removes the NT listeners and closes the node publishers and subscribers before tearing down the window."""
+        # Removed first, so no late NT event calls master.after on a destroyed root
+        for listener in self._listeners:
+            self.inst.removeListener(listener)
+        self._changed_publisher.close()
+        for node in self.items.values():
+            for handle in (node.publisher, node.subscriber):
+                if handle is not None:
+                    handle.close()
+        self.master.destroy()
 
     # --- NetworkTables Sync & Update (Java -> Python) ---
-    def periodic_update(self):
-        global nt_robot_ip
-        global nt_server_ip
-        global nt_sim_ip
-        
-        """Main loop called periodically to update connection status and sync data."""
-        if self.inst.isConnected():
+    def _on_conn_event(self, event):
+        """Called on the NT listener thread; hands the connection change over to the Tk thread."""
+        self.master.after(0, self._apply_conn_state, event.is_(ntcore.EventFlags.kConnected))
+
+    def _apply_conn_state(self, is_connected):
+        if is_connected:
             self.status_label.config(text=f"Connected to {nt_server_ip}", fg="#39FF14")
-            self.sync_from_nt()
         else:
             self.status_label.config(text=f"Disconnected - trying to connect to {nt_server_ip}", fg="#FF4136")
+
+    def periodic_update(self):
+        """Alternates between the sim and robot servers while disconnected, without blocking the Tk thread."""
+        global nt_server_ip
+        if not self.inst.isConnected():
             if(nt_server_ip == nt_sim_ip):
                 nt_server_ip = nt_robot_ip
             elif(nt_server_ip == nt_robot_ip):
                 nt_server_ip = nt_sim_ip
             self.inst.setServer(nt_server_ip)
-            time.sleep(3)
-            
-        
-        self.master.after(UPDATE_PERIOD_MS, self.periodic_update)
-
-    def sync_from_nt(self):
-        """Read all values from NetworkTables and update the GUI if they differ."""
-        # Define mappings from NT string values to internal states
-        stick_state_map = {"EMPTY": (False, False, False), "GAMEPIECE": (True, False, False), "RESTRICTED": (False, True, False), "GOAL": (False, False, True)}
-        side_state_map = {"ALLOWED": False, "RESTRICTED": True}
-
-        for side_id in range(6):
-            side_table = self.table.getSubTable(f"Side{side_id}")
-            
-            # Sync Hexagon Side State
-            node = self.hex_sides_lookup.get(side_id)
-            if node:
-                nt_val = side_table.getString("State", "ALLOWED")
-                new_flagged = side_state_map.get(nt_val, False)
-                if node.is_flagged != new_flagged:
-                    node.is_flagged = new_flagged
-                    self._update_hex_side_visuals(node)
-            
-            # Sync Algae (Green) Dot State
-            node = self.green_dots_lookup.get(side_id)
-            if node:
-                nt_val = side_table.getString("Algae", "EMPTY")
-                new_active, new_flagged, new_goal = stick_state_map.get(nt_val, (False, False, False))
-                if node.is_active != new_active or node.is_flagged != new_flagged or node.is_goal != new_goal:
-                    node.is_active = new_active
-                    node.is_flagged = new_flagged
-                    node.has_algae = new_active
-                    node.is_goal = new_goal
-                    self._update_dot_visuals(node)
-
-            # Sync Sub-Reef (Purple) Dot States
-            for sub_reef_id in range(2):
-                branch_table = side_table.getSubTable(str(sub_reef_id))
-                for level_name, radius_name in self.inverse_level_map.items():
-                    node = self.purple_dots_lookup.get((side_id, sub_reef_id, radius_name))
-                    if node:
-                        nt_val = branch_table.getString(level_name, "EMPTY")
-                        new_active, new_flagged, new_goal = stick_state_map.get(nt_val, (False, False, False))
-                        if node.is_active != new_active or node.is_flagged != new_flagged or node.is_goal != new_goal:
-                            node.is_active = new_active
-                            node.is_flagged = new_flagged
-                            node.is_goal = new_goal
-                            self._update_dot_visuals(node)
+            self._apply_conn_state(False)
+        self.master.after(SERVER_RETRY_MS, self.periodic_update)
+
+    def subscribe_to_nt(self):
+        """Registers a listener per node topic so NT pushes state changes instead of being polled."""
+        # Only remote values matter (our own publishes are already drawn); kImmediate applies the current state
+        flags = ntcore.EventFlags.kValueRemote | ntcore.EventFlags.kImmediate
+        for node in self.items.values():
+            default = "EMPTY" if isinstance(node, DotNode) else "ALLOWED"
+            # The listener doesn't keep its subscriber alive, so the node holds on to it
+            node.subscriber = self.table.getStringTopic(node.topic_path).subscribe(default)
+            self._listeners.append(self.inst.addListener(node.subscriber, flags,
+                                  lambda event, node=node: self._queue_state(node, event.data.value.value())))
+
+    def _queue_state(self, node, nt_val):
+        """Called on the NT listener thread; batches values so a burst of updates is applied in one Tk callback."""
+        with self._pending_lock:
+            self._pending_states[node] = nt_val # Only the latest value per node matters
+            if self._states_flush_scheduled:
+                return
+            self._states_flush_scheduled = True
+        try:
+            self.master.after(0, self._flush_states)
+        except Exception:
+            # Nothing was scheduled (e.g. the window is gone), so let the next update try again
+            with self._pending_lock:
+                self._states_flush_scheduled = False
+            raise
+
+    def _flush_states(self):
+        with self._pending_lock:
+            states, self._pending_states = self._pending_states, {}
+            self._states_flush_scheduled = False
+        self._deferred_fills = {}
+        try:
+            for node, nt_val in states.items():
+                if isinstance(node, DotNode):
+                    self._apply_dot_state(node, nt_val)
+                else:
+                    self._apply_side_state(node, nt_val)
+        finally:
+            fills, self._deferred_fills = self._deferred_fills, None
+            self._paint_fills(fills)
+
+    def _paint_fills(self, fills):
+        """Paints a batch of fills, using one itemconfig per group tag when a whole group ends up the same color."""
+        changed = {node: color for node, color in fills.items() if node.current_fill != color}
+        if not changed: return
+        for group_tag, members in self._fill_groups.items():
+            final_colors = {changed.get(node, node.current_fill) for node in members}
+            if len(final_colors) == 1 and any(node in changed for node in members):
+                color = final_colors.pop()
+                self.canvas.itemconfig(group_tag, fill=color)
+                for node in members:
+                    node.current_fill = color
+                    changed.pop(node, None)
+        for node, color in changed.items():
+            self.canvas.itemconfig(node.canvas_id, fill=color)
+            node.current_fill = color
+
+    def _apply_dot_state(self, node, nt_val):
+        """Applies a dot's NT state string on the Tk thread."""
+        new_active, new_flagged, new_goal = STICK_STATE_MAP.get(nt_val, (False, False, False))
+        if node.is_active != new_active or node.is_flagged != new_flagged or node.is_goal != new_goal:
+            node.is_active = new_active
+            node.is_flagged = new_flagged
+            node.is_goal = new_goal
+            if node.type == 'green':
+                node.has_algae = new_active
+            self._update_dot_visuals(node)
+
+    def _apply_side_state(self, node, nt_val):
+        """Applies a hexagon side's NT state string on the Tk thread."""
+        new_flagged = SIDE_STATE_MAP.get(nt_val, False)
+        if node.is_flagged != new_flagged:
+            node.is_flagged = new_flagged
+            self._update_hex_side_visuals(node)
 
     # --- Visual Update and Utility Methods ---
     def _update_dot_visuals(self, node):
         """Updates a dot's color based on its state, without publishing."""
-        new_color = ""
         if node.is_goal:
-            new_color = self.COLORS['goal']
+            new_color = node.goal_color
         elif node.is_flagged:
-            new_color = self.COLORS['red_flagged']
+            new_color = node.flagged_color
         elif node.is_active:
-            new_color = self.COLORS['white_toggled'] if node.type == 'purple' else self.COLORS['green_toggled']
+            new_color = node.active_color
         else: # Not active, not flagged
             # Check if it's currently being hovered over
-            if node.canvas_id == self.currently_hovered_id:
-                 new_color = self.COLORS['purple_hover'] if node.type == 'purple' else self.COLORS['green_hover']
-            else:
-                 new_color = self.COLORS['purple'] if node.type == 'purple' else self.COLORS['green']
-        self.canvas.itemconfig(node.canvas_id, fill=new_color)
+            new_color = node.hover_color if node.canvas_id == self.currently_hovered_id else node.default_color
+        self._set_fill(node, new_color)
 
     def _update_hex_side_visuals(self, node):
         """Updates a hex side's color based on its state, without publishing."""
-        new_color = self.COLORS['red_flagged'] if node.is_flagged else self.COLORS['purple']
-        self.canvas.itemconfig(node.canvas_id, fill=new_color)
+        self._set_fill(node, node.flagged_color if node.is_flagged else node.default_color)
+
+    def _set_fill(self, node, color):
+        """Sets a node's fill, skipping the Tk call when it already has that color."""
+        if self._deferred_fills is not None:
+            self._deferred_fills[node] = color # Painted by _paint_fills; the last color set in the batch wins
+        elif node.current_fill != color:
+            self.canvas.itemconfig(node.canvas_id, fill=color)
+            node.current_fill = color
 
     def on_dot_enter(self, event):
-        new_hovered_id = self.canvas.find_closest(event.x, event.y)[0]
-        if self.currently_hovered_id and self.currently_hovered_id != new_hovered_id:
-            self.reset_hover_visuals(self.currently_hovered_id)
-        
-        self.currently_hovered_id = new_hovered_id
-        node = self.dot_nodes.get(new_hovered_id)
+        self.currently_hovered_id = self.canvas.find_withtag('current')[0]
+        self._schedule_hover_flush()
+
+    def on_dot_leave(self, event):
+        self.currently_hovered_id = None
+        self._schedule_hover_flush()
+
+    def _schedule_hover_flush(self):
+        # Enter/Leave bursts from fast mouse moves are coalesced so only the final hover state is painted
+        if not self._hover_flush_pending:
+            self._hover_flush_pending = True
+            self.master.after_idle(self._flush_hover)
+
+    def _flush_hover(self):
+        self._hover_flush_pending = False
+        new_hovered_id = self.currently_hovered_id
+        if self._painted_hover_id == new_hovered_id:
+            return
+        if self._painted_hover_id:
+            self.reset_hover_visuals(self._painted_hover_id)
+
+        self._painted_hover_id = new_hovered_id
+        node = self.items.get(new_hovered_id)
         # Apply hover effect only if the dot is not active and not flagged.
         if node and not node.is_active and not node.is_flagged and not node.is_goal:
-            hover_color = self.COLORS['purple_hover'] if node.type == 'purple' else self.COLORS['green_hover']
-            self.canvas.itemconfig(new_hovered_id, fill=hover_color)
+            self._set_fill(node, node.hover_color)
+
 
-    def on_dot_leave(self, event):
-        if self.currently_hovered_id:
-            self.reset_hover_visuals(self.currently_hovered_id)
-            self.currently_hovered_id = None
-            
     def reset_hover_visuals(self, canvas_id):
-        node = self.dot_nodes.get(canvas_id)
+        node = self.items.get(canvas_id)
         # Only reset color if it's in a non-toggled, non-flagged state
         if node and not node.is_active and not node.is_flagged and not node.is_goal:
-            default_color = self.COLORS['purple'] if node.type == 'purple' else self.COLORS['green']
-            self.canvas.itemconfig(canvas_id, fill=default_color)
+            self._set_fill(node, node.default_color)
 
     def get_circle_position(self, radius, angle_degrees):
-        angle_radians = math.radians(angle_degrees - 90)
-        x = self.CENTER_X + radius * math.cos(angle_radians)
-        y = self.CENTER_Y + radius * math.sin(angle_radians)
+        cos_a, sin_a = unit_vector(angle_degrees)
+        x = self.CENTER_X + radius * cos_a
+        y = self.CENTER_Y + radius * sin_a
         return x, y
 
 if __name__ == "__main__":